@@ -54,6 +54,11 @@ class ModbusConfig(BaseModel):
     parity: str = Field(default_factory=lambda: os.environ.get("SUN2000_SERIAL_PARITY", "N").strip().upper())
     bytesize: int = Field(default_factory=lambda: int(os.environ.get("SUN2000_SERIAL_BYTESIZE", "8")))
     stopbits: int = Field(default_factory=lambda: int(os.environ.get("SUN2000_SERIAL_STOPBITS", "1")))
+    max_read_count: int = Field(default_factory=lambda: int(os.environ.get("SUN2000_MODBUS_MAX_READ_COUNT", "125")))
+    max_read_gap: int = Field(default_factory=lambda: int(os.environ.get("SUN2000_MODBUS_MAX_READ_GAP", "4")))
+    retries: int = Field(default_factory=lambda: int(os.environ.get("SUN2000_MODBUS_RETRIES", "2")))
+    backoff_base: float = Field(default_factory=lambda: float(os.environ.get("SUN2000_MODBUS_BACKOFF_BASE", "0.005")))  # seconds
+    heartbeat_interval: float = Field(default_factory=lambda: float(os.environ.get("SUN2000_MODBUS_HEARTBEAT_INTERVAL", "30")))  # seconds
 
 class ExporterConfig(BaseModel):
     """Main exporter configuration"""
@@ -66,11 +71,18 @@ class ExporterConfig(BaseModel):
     retry_delay: int = Field(default_factory=lambda: int(os.environ.get("RETRY_DELAY", "5")))  # seconds
     enable_control: bool = Field(default_factory=lambda: env_bool("EXPORTER_ENABLE_CONTROL", False))
     stale_after_seconds: int = Field(default_factory=lambda: int(os.environ.get("EXPORTER_STALE_AFTER_SECONDS", "180")))
+    telemetry_cache_ttl: float = Field(default_factory=lambda: float(os.environ.get("TELEMETRY_CACHE_TTL", "1.0")))  # seconds
+    telemetry_poll_interval: float = Field(default_factory=lambda: float(os.environ.get("TELEMETRY_POLL_INTERVAL", "0")))  # seconds
+    telemetry_slow_poll_interval: float = Field(default_factory=lambda: float(os.environ.get("TELEMETRY_SLOW_POLL_INTERVAL", "10")))  # seconds
+    device_cache_ttl: float = Field(default_factory=lambda: float(os.environ.get("DEVICE_CACHE_TTL", "3600")))  # seconds
     
 class HTTPConfig(BaseModel):
     """HTTP server configuration"""
     host: str = Field(default_factory=lambda: os.environ.get("HTTP_HOST", "0.0.0.0"))
     port: int = Field(default_factory=lambda: int(os.environ.get("HTTP_PORT", "8080")))
+    access_log: bool = Field(default_factory=lambda: env_bool("HTTP_ACCESS_LOG", True))
+    keep_alive_timeout: int = Field(default_factory=lambda: int(os.environ.get("HTTP_KEEP_ALIVE_TIMEOUT", "30")))  # seconds
+    request_timeout: float = Field(default_factory=lambda: float(os.environ.get("HTTP_REQUEST_TIMEOUT", "10")))  # seconds
 
 class AppConfig(BaseModel):
     """Application configuration"""
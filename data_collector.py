@@ -1,5 +1,4 @@
 import logging
-import asyncio
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -7,12 +6,12 @@ from apscheduler.triggers.interval import IntervalTrigger
 from collections import deque
 from config import config
 from influxdb_writer import AlarmEventPoint, TelemetryPoint, influxdb_writer
+from telemetry_cache import telemetry_cache
 
 # Import the modbus client classes
 from modbus_client import (
-    HuaweiModbusClient, TELEMETRY_MAP, DEVICE_MAP,
-    parse_int32_registers, parse_uint32_registers, parse_uint16_register, 
-    parse_int16_register, parse_epoch_seconds_registers, parse_string_registers
+    HuaweiModbusClient, TELEMETRY_MAP, DEVICE_MAP, TELEMETRY_READ_PLAN, DEVICE_READ_PLAN,
+    scale_register_value
 )
 
 logger = logging.getLogger(__name__)
@@ -48,7 +47,10 @@ class DataCollector:
             parity=config.modbus.parity,
             bytesize=config.modbus.bytesize,
             stopbits=config.modbus.stopbits,
+            retries=config.modbus.retries,
+            backoff_base=config.modbus.backoff_base,
         )
+        self._owns_modbus_client = True
         self.device_info: Optional[Dict[str, Any]] = None
         self.is_running = False
         self.started_at: Optional[datetime] = None
@@ -62,6 +64,15 @@ class DataCollector:
         self.dropped_alarm_events = 0
         self.last_alarm_snapshot: Optional[Dict[str, Optional[float]]] = None
         
+    def use_modbus_client(self, modbus_client: HuaweiModbusClient):
+        """Poll through a connection owned by the caller; the collector will not close it"""
+        self.modbus_client = modbus_client
+        self._owns_modbus_client = False
+
+    def _close_modbus_client(self):
+        if self._owns_modbus_client:
+            self.modbus_client.close()
+
     async def start(self):
         """Start the data collector"""
         if self.is_running:
@@ -121,7 +132,7 @@ class DataCollector:
         except Exception as e:
             logger.error(f"Failed to start data collector: {e}")
             self.is_running = False
-            self.modbus_client.close()
+            self._close_modbus_client()
             await influxdb_writer.disconnect()
             raise
     
@@ -140,7 +151,7 @@ class DataCollector:
                 self.scheduler.shutdown()
             
             # Close connections
-            self.modbus_client.close()
+            self._close_modbus_client()
             await influxdb_writer.disconnect()
             
             self.is_running = False
@@ -149,39 +160,19 @@ class DataCollector:
         except Exception as e:
             logger.error(f"Error stopping data collector: {e}")
     
-    def _parse_device_value(self, regs, data_type):
-        """Parse device value based on data type"""
-        if data_type == "string":
-            return parse_string_registers(regs)
-        elif data_type == "int32":
-            return parse_int32_registers(regs)
-        elif data_type == "uint32":
-            return parse_uint32_registers(regs)
-        elif data_type == "uint16":
-            return parse_uint16_register(regs)
-        elif data_type == "int16":
-            return parse_int16_register(regs)
-        else:
-            return regs[0] if len(regs) == 1 else regs
-    
     async def _collect_device_info(self):
         """Collect static device information"""
         try:
             device_info = {}
+            values, errors = await self.modbus_client.read_register_values(DEVICE_READ_PLAN)
             for key, spec in DEVICE_MAP.items():
-                try:
-                    regs = await self.modbus_client.read_holding_registers(spec["address"], spec["count"])
-                    value = self._parse_device_value(regs, spec["type"])
-                    
-                    # Apply scaling if specified and value is numeric
-                    if isinstance(value, (int, float)) and "scale" in spec:
-                        value = round(value * spec["scale"], 6)
-                        
-                    device_info[key] = value
-                except Exception as e:
-                    logger.warning(f"Failed to read device info {key}: {e}")
+                if key not in values:
+                    logger.warning(f"Failed to read device info {key}: {errors.get(key)}")
                     device_info[key] = None
-                    
+                    continue
+
+                device_info[key] = scale_register_value(values[key], spec.get("scale", 1))
+
             self.device_info = device_info
             logger.info(f"Device info collected: {device_info}")
             
@@ -189,42 +180,21 @@ class DataCollector:
             logger.error(f"Failed to collect device info: {e}")
             self.device_info = {}
     
-    def _parse_telemetry_value(self, regs, data_type):
-        """Parse telemetry value based on data type"""
-        if data_type == "int32":
-            return parse_int32_registers(regs)
-        elif data_type == "uint32":
-            return parse_uint32_registers(regs)
-        elif data_type == "uint16":
-            return parse_uint16_register(regs)
-        elif data_type == "int16":
-            return parse_int16_register(regs)
-        elif data_type == "epoch_seconds":
-            return parse_epoch_seconds_registers(regs)
-        else:
-            return regs[0] if len(regs) == 1 else regs
-    
     async def _collect_telemetry_data(self) -> Dict[str, Any]:
         """Collect current telemetry data from the inverter"""
         telemetry = {}
         failed_count = 0
-        
+
+        # One read per planned register block instead of one per field
+        values, errors = await self.modbus_client.read_register_values(TELEMETRY_READ_PLAN)
         for key, spec in TELEMETRY_MAP.items():
-            try:
-                regs = await self.modbus_client.read_holding_registers(spec["address"], spec["count"])
-                value = self._parse_telemetry_value(regs, spec["type"])
-                
-                if value is not None and isinstance(value, (int, float)):
-                    # Apply scaling
-                    scale = spec.get("scale", 1)
-                    value = round(value * scale, 6)
-                    
-                telemetry[key] = value
-                    
-            except Exception as e:
-                logger.warning(f"Failed to read telemetry {key}: {e}")
+            if key not in values:
+                logger.warning(f"Failed to read telemetry {key}: {errors.get(key)}")
                 telemetry[key] = None
                 failed_count += 1
+                continue
+
+            telemetry[key] = scale_register_value(values[key], spec.get("scale", 1))
         
         # Log summary of collection
         total_count = len(TELEMETRY_MAP)
@@ -239,8 +209,14 @@ class DataCollector:
     async def _collect_and_buffer_data(self):
         """Collect telemetry data and add to buffer"""
         try:
+            generation = telemetry_cache.generation
             telemetry = await self._collect_telemetry_data()
             collected_at = datetime.now(timezone.utc)
+            # Let /telemetry answer from this poll instead of re-reading the inverter
+            telemetry_cache.update(
+                {key: value for key, value in telemetry.items() if value is not None},
+                generation=generation,
+            )
             alarm_events = self._build_alarm_events(telemetry, collected_at)
             
             # Create telemetry point
@@ -0,0 +1,101 @@
+"""Fakes shared by the test modules: an in-memory Modbus device and driver test fixtures."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+from modbus_client import DEVICE_READ_PLAN, TELEMETRY_READ_PLAN, HuaweiModbusClient
+from telemetry_cache import TelemetryCache
+
+
+class FakeResponse:
+    def __init__(self, registers=None, error=False, exception_code=None):
+        self.registers = registers or []
+        self._error = error
+        self.exception_code = exception_code
+
+    def isError(self):
+        return self._error
+
+
+class FakeModbus:
+    """Serves holding registers from a dict and rejects reads touching unknown addresses."""
+
+    connected = True
+
+    def __init__(self, registers):
+        self.registers = registers
+        self.reads = []
+        self.writes = []
+
+    async def read_holding_registers(self, address, count, device_id=0):
+        self.reads.append((address, count))
+        window = range(address, address + count)
+        if any(addr not in self.registers for addr in window):
+            return FakeResponse(error=True, exception_code=2)
+        return FakeResponse([self.registers[addr] for addr in window])
+
+    async def write_register(self, address, value, device_id=0):
+        return await self.write_registers(address, [value], device_id=device_id)
+
+    async def write_registers(self, address, values, device_id=0):
+        self.writes.append((address, list(values)))
+        for offset, value in enumerate(values):
+            self.registers[address + offset] = value
+        return FakeResponse()
+
+
+def make_client(registers):
+    client = HuaweiModbusClient("127.0.0.1", 502, 1)
+    fake = client.client = FakeModbus(registers)
+    client.opens = 0
+
+    async def reopen():
+        client.opens += 1
+        client.client = fake
+
+    client._open = reopen
+    return client
+
+
+def plan_registers(plan, value=1):
+    return {addr: value for start, count, _, _ in plan for addr in range(start, start + count)}
+
+
+async def asgi_get(app, path):
+    """Send a GET through the full ASGI stack; returns (status, body)."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [], "http_version": "1.1", "scheme": "http", "server": ("test", 80), "client": ("test", 1),
+        "root_path": "",
+    }
+    await app(scope, receive, send)
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
+
+
+class DriverTestCase(unittest.IsolatedAsyncioTestCase):
+    """Points the driver at a FakeModbus holding the device and telemetry blocks, with fresh caches."""
+
+    def setUp(self):
+        from iot_driver_copilot.huawei_sun_2000_solar_inverter import driver
+        self.driver = driver
+        self.fake = FakeModbus({**plan_registers(DEVICE_READ_PLAN), **plan_registers(TELEMETRY_READ_PLAN)})
+        for patcher in (
+            mock.patch.object(driver.modbus_client, "client", self.fake),
+            mock.patch.object(driver.modbus_client, "_split_blocks", set()),
+            mock.patch.object(driver.modbus_client, "_inflight", {}),
+            mock.patch.object(driver, "_device_info_cache", None),
+            mock.patch.object(driver, "_device_info_lock", asyncio.Lock()),
+            mock.patch.object(driver, "telemetry_cache", TelemetryCache(ttl=5.0)),
+            mock.patch.object(driver.data_collector, "device_info", {}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
@@ -1,8 +1,8 @@
 import logging
 import asyncio
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timezone
-from dataclasses import dataclass, asdict
+from datetime import datetime
+from dataclasses import dataclass
 from influxdb_client import InfluxDBClient, Point, WritePrecision
 from influxdb_client.client.write_api import ASYNCHRONOUS
 from influxdb_client.rest import ApiException
@@ -54,8 +54,8 @@ class InfluxDBWriter:
                 timeout=config.influxdb.timeout * 1000  # Convert to milliseconds
             )
             
-            # Test connection
-            ready = self.client.ping()
+            # Test connection; ping is blocking HTTP, so keep it off the event loop
+            ready = await asyncio.to_thread(self.client.ping)
             if ready:
                 self.write_api = self.client.write_api(write_options=ASYNCHRONOUS)
                 self._connected = True
@@ -206,7 +206,7 @@ class InfluxDBWriter:
             return {"status": "disconnected", "error": "No client initialized"}
         
         try:
-            ready = self.client.ping()
+            ready = await asyncio.to_thread(self.client.ping)
             if ready:
                 return {"status": "healthy", "url": config.influxdb.url, "org": config.influxdb.org}
             else:
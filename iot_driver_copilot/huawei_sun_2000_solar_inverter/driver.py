@@ -1,10 +1,14 @@
+import asyncio
+import functools
 import os
 import sys
 import logging
 import math
+import time
 from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 from contextlib import asynccontextmanager
+import orjson
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
@@ -13,11 +17,12 @@ from pydantic import BaseModel, Field
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from config import config
 from modbus_client import (
-    HuaweiModbusClient, TELEMETRY_MAP, DEVICE_MAP, CONTROL_MAP, SETTINGS_MAP,
-    parse_register_value, build_register_payload
+    HuaweiModbusClient, TELEMETRY_MAP, DEVICE_MAP, CONTROL_MAP, SETTINGS_MAP, MAX_WRITE_COUNT,
+    TELEMETRY_READ_PLAN, DEVICE_READ_PLAN, SETTINGS_READ_PLAN, parse_register_value, scale_register_value, build_register_payload, select_register_blocks
 )
 from data_collector import data_collector
 from influxdb_writer import influxdb_writer
+from telemetry_cache import telemetry_cache
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -114,8 +119,14 @@ HTTP_HOST = config.http.host
 HTTP_PORT = config.http.port
 MODBUS_TIMEOUT = config.modbus.timeout
 
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson rather than the stdlib encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
 # FastAPI app
-app = FastAPI(title="Huawei SUN2000 DeviceShifu Driver")
+app = FastAPI(title="Huawei SUN2000 DeviceShifu Driver", default_response_class=ORJSONResponse)
 
 class ControlCommand(BaseModel):
     commands: List[dict] = Field(..., description="List of control commands with keys: 'name' (eg. 'active_power_limit'), 'value'")
@@ -135,16 +146,32 @@ modbus_client = HuaweiModbusClient(
     parity=config.modbus.parity,
     bytesize=config.modbus.bytesize,
     stopbits=config.modbus.stopbits,
+    retries=config.modbus.retries,
+    backoff_base=config.modbus.backoff_base,
 )
 
 # RTU serial devices cannot be opened twice. Reuse the API client for the
-# collector so the exporter holds a single Modbus connection.
-data_collector.modbus_client = modbus_client
+# collector so the exporter holds a single, long-lived Modbus connection;
+# stopping the collector leaves it open for the API.
+data_collector.use_modbus_client(modbus_client)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await modbus_client.connect()
+    tasks = []
+    if config.modbus.transport == "tcp" and config.modbus.heartbeat_interval > 0:
+        # Keeps NAT/firewall state for an idle link and reconnects a dropped one
+        # before the next request has to.
+        tasks.append(asyncio.create_task(modbus_client.heartbeat(config.modbus.heartbeat_interval)))
+    if config.exporter.telemetry_poll_interval > 0:
+        interval = config.exporter.telemetry_poll_interval
+        slow_interval = config.exporter.telemetry_slow_poll_interval
+        ttl = polled_cache_ttl(telemetry_cache.ttl, interval, slow_interval)
+        if ttl != telemetry_cache.ttl:
+            logger.info(f"Raising the telemetry cache TTL from {telemetry_cache.ttl}s to {ttl}s to cover the poll cycle")
+            telemetry_cache.ttl = ttl
+        tasks.append(asyncio.create_task(poll_telemetry(interval, slow_interval)))
     # Start data collector
     try:
         await data_collector.start()
@@ -155,6 +182,8 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    for task in tasks:
+        task.cancel()
     modbus_client.close()
     # Stop data collector
     try:
@@ -164,8 +193,22 @@ async def lifespan(app: FastAPI):
         logger.error(f"Error stopping data collector: {e}")
 
 # FastAPI app with lifespan context manager
-app = FastAPI(title="Huawei SUN2000 DeviceShifu Driver", lifespan=lifespan)
+app = FastAPI(title="Huawei SUN2000 DeviceShifu Driver", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+@asynccontextmanager
+async def inverter_deadline(what: str):
+    """Answer 504 once a read endpoint has waited HTTP_REQUEST_TIMEOUT seconds on the inverter.
 
+    Only reads use it: an abandoned shared Modbus read keeps running for its
+    other waiters, whereas a cancelled write batch could be left half-applied.
+    """
+    timeout = config.http.request_timeout
+    try:
+        async with asyncio.timeout(timeout if timeout > 0 else None):
+            yield
+    except TimeoutError:
+        logger.warning(f"{what} exceeded the {timeout}s request deadline")
+        raise HTTPException(status_code=504, detail="Timed out waiting for the inverter")
 
 async def build_health_payload():
     collector_status = data_collector.get_status()
@@ -214,29 +257,58 @@ async def build_health_payload():
         "unhealthy_components": unhealthy_components,
     }
 
+# Identity and ratings do not change while the exporter runs, so /device is
+# answered from memory until DEVICE_CACHE_TTL expires: (monotonic time, info).
+_device_info_cache: Optional[tuple] = None
+_device_info_lock = asyncio.Lock()
+
+def cached_device_info() -> Optional[Dict[str, Any]]:
+    if _device_info_cache is not None and time.monotonic() - _device_info_cache[0] < config.exporter.device_cache_ttl:
+        return _device_info_cache[1]
+    return None
+
+async def read_device_info() -> Dict[str, Any]:
+    info = cached_device_info()
+    if info is not None:
+        return info
+    # Concurrent cold requests wait for the first read instead of repeating it.
+    async with _device_info_lock:
+        info = cached_device_info()
+        if info is not None:
+            return info
+        return await _refresh_device_info()
+
+async def _refresh_device_info() -> Dict[str, Any]:
+    global _device_info_cache
+    if _device_info_cache is None:
+        # The collector reads the same block when it starts; reuse that snapshot
+        # rather than sending the first /device to the inverter again.
+        collected = data_collector.device_info
+        if collected and all(collected.get(key) is not None for key in DEVICE_MAP):
+            _device_info_cache = (time.monotonic(), collected)
+            return collected
+    # The device block is contiguous, so this is a single Modbus request.
+    values, errors = await modbus_client.read_register_values(DEVICE_READ_PLAN)
+    if errors:
+        raise next(iter(errors.values()))
+    info = {key: apply_scale(values[key], spec) for key, spec in DEVICE_MAP.items()}
+    _device_info_cache = (time.monotonic(), info)
+    return info
+
 @app.get("/device", summary="Get device information")
 async def get_device_info():
     try:
-        result = {}
-        for key, spec in DEVICE_MAP.items():
-            regs = await modbus_client.read_holding_registers(spec["address"], spec["count"])
-            value = parse_register_value(regs, spec["type"])
-            
-            # Apply scaling if specified
-            if isinstance(value, (int, float)) and "scale" in spec:
-                value = round(value * spec["scale"], 6)
-                
-            result[key] = value
-        return JSONResponse(result)
+        async with inverter_deadline("/device"):
+            info = await read_device_info()
+        return ORJSONResponse(info)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def parse_telemetry_value(regs, data_type):
-    return parse_register_value(regs, data_type)
-
 def apply_scale(value: Any, spec: Dict[str, Any]) -> Any:
-    if isinstance(value, (int, float)) and "scale" in spec:
-        return round(value * spec["scale"], 6)
+    if "scale" in spec:
+        return scale_register_value(value, spec["scale"])
     return value
 
 def _coerce_finite_number(value: Any) -> Optional[float]:
@@ -247,23 +319,26 @@ def _coerce_finite_number(value: Any) -> Optional[float]:
         return None
     return numeric
 
+# Raw register range per type, before scaling.
+TYPE_RANGES = {
+    "uint16": (0.0, 65535.0),
+    "int16": (-32768.0, 32767.0),
+    "uint32": (0.0, 4294967295.0),
+    "int32": (-2147483648.0, 2147483647.0),
+}
+
 def _resolve_type_bounds(spec: Dict[str, Any]) -> Dict[str, Optional[float]]:
-    scale = spec.get("scale", 1) or 1
     data_type = spec["type"]
-    if data_type == "uint16":
-        return {"minimum": 0.0, "maximum": 65535.0 * scale}
-    if data_type == "int16":
-        return {"minimum": -32768.0 * scale, "maximum": 32767.0 * scale}
-    if data_type == "uint32":
-        return {"minimum": 0.0, "maximum": 4294967295.0 * scale}
-    if data_type == "int32":
-        return {"minimum": -2147483648.0 * scale, "maximum": 2147483647.0 * scale}
     if data_type == "epoch_seconds":
         return {"minimum": 0.0, "maximum": 4294967295.0}
-    return {"minimum": None, "maximum": None}
+    bounds = TYPE_RANGES.get(data_type)
+    if bounds is None:
+        return {"minimum": None, "maximum": None}
+    scale = spec.get("scale", 1) or 1
+    return {"minimum": bounds[0] * scale, "maximum": bounds[1] * scale}
 
 async def get_device_limits() -> Dict[str, Any]:
-    info = dict(data_collector.device_info or {})
+    info = dict(data_collector.device_info or cached_device_info() or {})
     required_fields = {
         "model": "model",
         "rated_power": "rated_power",
@@ -274,13 +349,14 @@ async def get_device_limits() -> Dict[str, Any]:
     }
 
     missing = [field for field, key in required_fields.items() if info.get(field) is None]
-    for field in missing:
-        spec = DEVICE_MAP[field]
-        try:
-            payload = await read_named_register(field, spec)
-            info[field] = payload["value"]
-        except Exception as exc:
-            logger.warning("Unable to refresh device limit field %s: %s", field, exc)
+    if missing:
+        # The limit fields sit in one device block, so refresh them in a single read.
+        values, errors = await modbus_client.read_register_values(select_register_blocks(DEVICE_READ_PLAN, missing))
+        for field in missing:
+            if field in values:
+                info[field] = apply_scale(values[field], DEVICE_MAP[field])
+            else:
+                logger.warning("Unable to refresh device limit field %s: %s", field, errors.get(field))
 
     rated_power_kw = _coerce_finite_number(info.get("rated_power")) or DEFAULT_LIMITS["rated_power_kw"]
     max_active_power_kw = _coerce_finite_number(info.get("max_active_power")) or rated_power_kw or DEFAULT_LIMITS["max_active_power_kw"]
@@ -382,8 +458,21 @@ def describe_write_constraints(name: str, spec: Dict[str, Any]) -> Dict[str, Any
 
     return descriptor
 
+# Register maps are static, so constraints are resolved once at import instead of per write.
+WRITE_CONSTRAINTS: Dict[str, Dict[str, Any]] = {
+    name: describe_write_constraints(name, spec)
+    for register_map in (CONTROL_MAP, SETTINGS_MAP)
+    for name, spec in register_map.items()
+}
+
+def get_write_constraints(name: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+    descriptor = WRITE_CONSTRAINTS.get(name)
+    if descriptor is None:
+        descriptor = describe_write_constraints(name, spec)
+    return descriptor
+
 async def validate_write_value(name: str, value: Any, spec: Dict[str, Any]) -> Any:
-    descriptor = describe_write_constraints(name, spec)
+    descriptor = get_write_constraints(name, spec)
     if not descriptor.get("writable", True):
         raise ValueError(descriptor.get("reason", f"{name} is not writable through this API"))
 
@@ -433,11 +522,10 @@ def serialize_register_metadata(name: str, spec: Dict[str, Any]) -> Dict[str, An
         "scale": spec.get("scale", 1),
         "unit": spec.get("unit"),
         "description": spec.get("description"),
-        "validation": describe_write_constraints(name, spec),
+        "validation": get_write_constraints(name, spec),
     }
 
-async def read_named_register(name: str, spec: Dict[str, Any]) -> Dict[str, Any]:
-    regs = await modbus_client.read_holding_registers(spec["address"], spec["count"])
+def describe_register_read(name: str, spec: Dict[str, Any], regs: List[int]) -> Dict[str, Any]:
     parsed = parse_register_value(regs, spec["type"])
     value = apply_scale(parsed, spec)
     return {
@@ -450,45 +538,211 @@ async def read_named_register(name: str, spec: Dict[str, Any]) -> Dict[str, Any]
         "unit": spec.get("unit"),
     }
 
-async def write_named_register(name: str, value: Any, spec: Dict[str, Any], read_back: bool = True) -> Dict[str, Any]:
+async def prepare_named_write(name: str, value: Any, spec: Dict[str, Any]) -> List[int]:
     value = await validate_write_value(name, value, spec)
-    regs = build_register_payload(spec, value)
-    await modbus_client.write_registers(spec["address"], regs)
-    result = {
+    return build_register_payload(spec, value)
+
+def build_write_result(name: str, spec: Dict[str, Any], regs: List[int]) -> Dict[str, Any]:
+    return {
         "name": name,
         "status": "ok",
         "written_registers": regs,
         "address": spec["address"],
     }
-    if read_back and spec["type"] != "mld":
+
+async def finish_group_write(group: List[tuple]) -> List[Dict[str, Any]]:
+    """Build results for one contiguous write, reading the written span back in one request."""
+    results = [build_write_result(name, spec, regs) for _, name, spec, regs in group]
+    checked = [
+        (result, name, spec)
+        for result, (_, name, spec, _) in zip(results, group)
+        if name not in COMMAND_TRIGGER_VALUES and spec["type"] != "mld"
+    ]
+    if not checked:
+        return results
+
+    start = group[0][2]["address"]
+    count = sum(len(regs) for _, _, _, regs in group)
+    try:
+        block = await modbus_client.read_holding_registers(start, count)
+    except Exception as exc:
+        for result, _, _ in checked:
+            result["read_back_error"] = str(exc)
+        return results
+    for result, name, spec in checked:
+        offset = spec["address"] - start
+        result["read_back"] = describe_register_read(name, spec, block[offset:offset + spec["count"]])
+    return results
+
+def group_contiguous_writes(writes: List[tuple]) -> List[List[tuple]]:
+    """Merge consecutive (index, name, spec, regs) writes that target adjacent registers.
+
+    Request order is preserved and command triggers are never merged, so each
+    power_on/shutdown/reset stays its own transaction in the order it was sent.
+    """
+    groups: List[List[tuple]] = []
+    for write in writes:
+        _, name, spec, regs = write
+        if groups and name not in COMMAND_TRIGGER_VALUES:
+            group = groups[-1]
+            _, last_name, last_spec, last_regs = group[-1]
+            size = sum(len(item[3]) for item in group) + len(regs)
+            if (
+                last_name not in COMMAND_TRIGGER_VALUES
+                and last_spec["address"] + len(last_regs) == spec["address"]
+                and size <= MAX_WRITE_COUNT
+            ):
+                group.append(write)
+                continue
+        groups.append([write])
+    return groups
+
+async def apply_contiguous_writes(pending: List[tuple], results: List[Optional[Dict[str, Any]]], isolate_errors: bool = False):
+    """Send validated (index, name, spec, regs) writes grouped into multi-register transactions.
+
+    Each group's results are stored at their request index. With isolate_errors a
+    failed transaction is reported on its own entries instead of aborting the rest.
+    """
+    # Adjacent registers go out as one multi-register write instead of one round-trip each.
+    for group in group_contiguous_writes(pending):
+        payload = [reg for _, _, _, regs in group for reg in regs]
         try:
-            result["read_back"] = await read_named_register(name, spec)
+            await modbus_client.write_registers(group[0][2]["address"], payload)
         except Exception as exc:
-            result["read_back_error"] = str(exc)
-    return result
+            if not isolate_errors:
+                raise
+            for index, name, _, _ in group:
+                results[index] = {"name": name, "status": "error", "message": str(exc)}
+            continue
+        telemetry_cache.invalidate()
+        for (index, _, _, _), result in zip(group, await finish_group_write(group)):
+            results[index] = result
+
+async def read_telemetry_block(block, force: bool = False) -> tuple:
+    """Read one telemetry block unless a concurrent or recent read already covered it."""
+    start, count, fields, _ = block
+    # Warm hits skip the lock; it only orders readers that actually miss.
+    if not force:
+        cached = telemetry_cache.get_fresh(name for name, _, _ in fields)
+        if len(cached) == len(fields):
+            return cached, {}
+    async with telemetry_cache.lock(start, count):
+        if not force:
+            cached = telemetry_cache.get_fresh(name for name, _, _ in fields)
+            if len(cached) == len(fields):
+                return cached, {}
+
+        # A write landing during the read invalidates the cache; these values then predate it.
+        generation = telemetry_cache.generation
+        values, errors = await modbus_client.read_register_values([block])
+        scaled = {name: apply_scale(values[name], spec) for name, _, spec in fields if name in values}
+        telemetry_cache.update(scaled, generation=generation)
+        return scaled, errors
+
+# Energy counters change slowly; blocks holding only these are polled on the slow tier.
+SLOW_TELEMETRY_FIELDS = frozenset({
+    "cumulative_generated_electricity",
+    "daily_generated_electricity",
+    "monthly_generated_electricity",
+    "yearly_generated_electricity",
+    "electricity_generated_previous_hour",
+    "electricity_generated_previous_day",
+    "electricity_generated_previous_month",
+    "electricity_generated_previous_year",
+})
+
+# Alarm counters share a block with the previous-period energy counters; the
+# fast tier reads just the alarm registers and leaves the rest to the slow tier.
+FAST_TELEMETRY_PLAN = select_register_blocks(
+    TELEMETRY_READ_PLAN, [name for name in TELEMETRY_MAP if name not in SLOW_TELEMETRY_FIELDS]
+)
+
+def log_telemetry_failures(results: list, what: str):
+    """Log raised errors and per-field Modbus failures from gathered read_telemetry_block calls."""
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"{what} failed: {result!r}")
+        elif result[1]:
+            # Modbus failures come back per field rather than being raised.
+            logger.warning(f"{what} failed for {', '.join(result[1])}: {next(iter(result[1].values()))}")
+
+def polled_cache_ttl(ttl: float, interval: float, slow_interval: float) -> float:
+    """Cache TTL long enough that scrapes between two poller refreshes never reach the inverter.
+
+    A slow-tier block is refreshed up to slow_interval + interval apart, plus the
+    time one poll cycle spends reading, allowed for here as one Modbus timeout.
+    """
+    return max(ttl, max(interval, slow_interval) + interval + config.modbus.timeout)
+
+async def poll_telemetry(interval: float, slow_interval: float):
+    """Keep the telemetry cache warm so /telemetry is answered from memory."""
+    last_slow_poll = None
+    while True:
+        blocks = FAST_TELEMETRY_PLAN
+        now = time.monotonic()
+        if last_slow_poll is None or now - last_slow_poll >= slow_interval:
+            blocks = TELEMETRY_READ_PLAN
+            last_slow_poll = now
+        results = await asyncio.gather(*(read_telemetry_block(block, force=True) for block in blocks), return_exceptions=True)
+        log_telemetry_failures(results, "Telemetry poll")
+        await asyncio.sleep(interval)
+
+_background_tasks = set()
+
+async def refresh_telemetry_cache():
+    # Runs as a fire-and-forget task, so failures are logged here or nowhere.
+    results = await asyncio.gather(
+        *(read_telemetry_block(block, force=True) for block in TELEMETRY_READ_PLAN), return_exceptions=True
+    )
+    log_telemetry_failures(results, "Telemetry refresh after write")
+
+def schedule_telemetry_refresh():
+    """Re-read telemetry in the background so scrapes after a write hit a warm cache."""
+    task = asyncio.create_task(refresh_telemetry_cache())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+TELEMETRY_KEYS = frozenset(TELEMETRY_MAP)
+
+@functools.lru_cache(maxsize=128)
+def telemetry_blocks_for(names: frozenset) -> list:
+    """Trimmed read plan for a metrics filter; scrapers repeat the same few filters."""
+    return select_register_blocks(TELEMETRY_READ_PLAN, names)
 
 @app.get("/telemetry", summary="Get real-time telemetry")
 async def get_telemetry(metrics: Optional[List[str]] = Query(None)):
     try:
         result = {}
-        telemetry_items = [(m, TELEMETRY_MAP[m]) for m in metrics if m in TELEMETRY_MAP] if metrics else TELEMETRY_MAP.items()
-        
-        for key, spec in telemetry_items:
-            try:
-                regs = await modbus_client.read_holding_registers(spec["address"], spec["count"])
-                value = parse_telemetry_value(regs, spec["type"])
-                
-                if value is not None and isinstance(value, (int, float)):
-                    # Apply scaling
-                    scale = spec.get("scale", 1)
-                    value = round(value * scale, 6)
-                    
-                result[key] = value
-            except Exception as e:
-                logger.warning(f"Failed to read telemetry {key}: {e}")
+        if metrics:
+            selected = [m for m in dict.fromkeys(metrics) if m in TELEMETRY_KEYS]
+            blocks = telemetry_blocks_for(frozenset(selected))
+        else:
+            selected = TELEMETRY_MAP
+            blocks = TELEMETRY_READ_PLAN
+
+        values = {}
+        errors = {}
+        async with inverter_deadline("/telemetry"):
+            results = await asyncio.gather(*(read_telemetry_block(block) for block in blocks))
+        for block_values, block_errors in results:
+            values.update(block_values)
+            errors.update(block_errors)
+
+        for key in selected:
+            if key in errors:
+                logger.warning(f"Failed to read telemetry {key}: {errors[key]}")
                 result[key] = None
-                
-        return JSONResponse(result)
+                continue
+            result[key] = values[key]
+
+        response = ORJSONResponse(result)
+        # Lets scrapers tell a polled snapshot from a fresh read.
+        age = telemetry_cache.age(key for key in result if key in values)
+        if age is not None:
+            response.headers["X-Telemetry-Age"] = f"{age:.3f}"
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -498,7 +752,8 @@ async def control_device(cmd: ControlCommand):
         raise HTTPException(status_code=403, detail="Remote control is disabled in this environment")
 
     try:
-        results = []
+        results: List[Optional[Dict[str, Any]]] = []
+        pending = []
         for command in cmd.commands:
             name = command.get("name")
             value = command.get("value")
@@ -507,61 +762,83 @@ async def control_device(cmd: ControlCommand):
                 continue
             spec = CONTROL_MAP[name]
             try:
-                results.append(await write_named_register(name, value, spec, read_back=name not in {"power_on", "shutdown", "reset"}))
+                regs = await prepare_named_write(name, value, spec)
             except ValueError as exc:
                 results.append({"name": name, "status": "error", "message": str(exc)})
-        return JSONResponse({"results": results})
+                continue
+            pending.append((len(results), name, spec, regs))
+            results.append(None)
+
+        await apply_contiguous_writes(pending, results)
+
+        if any(result["status"] == "ok" for result in results):
+            schedule_telemetry_refresh()
+        return ORJSONResponse({"results": results})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/control/catalog", summary="List supported remote control commands")
 async def get_control_catalog():
-    return JSONResponse({"controls": [serialize_register_metadata(name, spec) for name, spec in CONTROL_MAP.items()]})
+    return ORJSONResponse({"controls": [serialize_register_metadata(name, spec) for name, spec in CONTROL_MAP.items()]})
 
 @app.get("/settings/catalog", summary="List supported remote settings")
 async def get_settings_catalog():
-    return JSONResponse({"settings": [serialize_register_metadata(name, spec) for name, spec in SETTINGS_MAP.items()]})
+    return ORJSONResponse({"settings": [serialize_register_metadata(name, spec) for name, spec in SETTINGS_MAP.items()]})
 
 @app.get("/settings", summary="Read current inverter settings")
 async def get_settings(names: Optional[List[str]] = Query(None)):
     selected_names = names if names else list(SETTINGS_MAP.keys())
     results = {}
+    if names:
+        blocks = select_register_blocks(SETTINGS_READ_PLAN, [name for name in names if name in SETTINGS_MAP])
+    else:
+        blocks = SETTINGS_READ_PLAN
+    async with inverter_deadline("/settings"):
+        registers, errors = await modbus_client.read_register_blocks(blocks)
     for name in selected_names:
         spec = SETTINGS_MAP.get(name)
         if not spec:
             results[name] = {"error": "Unknown setting"}
             continue
-        try:
-            results[name] = await read_named_register(name, spec)
-        except Exception as exc:
-            results[name] = {"name": name, "error": str(exc)}
-    return JSONResponse(results)
+        if name in registers:
+            results[name] = describe_register_read(name, spec, registers[name])
+        else:
+            results[name] = {"name": name, "error": str(errors.get(name))}
+    return ORJSONResponse(results)
 
 @app.put("/settings", summary="Write inverter settings")
 async def put_settings(payload: SettingsWriteRequest):
     if not config.exporter.enable_control:
         raise HTTPException(status_code=403, detail="Remote control is disabled in this environment")
 
-    results = []
+    # Every value is validated before the first write goes out.
+    results: List[Optional[Dict[str, Any]]] = []
+    pending = []
     for item in payload.settings:
         name = item.get("name")
         value = item.get("value")
         if name not in SETTINGS_MAP:
             results.append({"name": name, "status": "error", "message": "Unknown setting"})
             continue
+        spec = SETTINGS_MAP[name]
         try:
-            results.append(await write_named_register(name, value, SETTINGS_MAP[name], read_back=True))
-        except ValueError as exc:
-            results.append({"name": name, "status": "error", "message": str(exc)})
+            regs = await prepare_named_write(name, value, spec)
         except Exception as exc:
             results.append({"name": name, "status": "error", "message": str(exc)})
-    return JSONResponse({"results": results})
+            continue
+        pending.append((len(results), name, spec, regs))
+        results.append(None)
+
+    await apply_contiguous_writes(pending, results, isolate_errors=True)
+    if any(result["status"] == "ok" for result in results):
+        schedule_telemetry_refresh()
+    return ORJSONResponse({"results": results})
 
 # New endpoints for data collector management and health checks
 
 @app.get("/live", summary="Liveness check for the exporter service")
 async def liveness_check():
-    return JSONResponse(
+    return ORJSONResponse(
         {
             "status": "alive",
             "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -574,9 +851,9 @@ async def readiness_check():
     try:
         health_status = await build_health_payload()
         status_code = 200 if health_status["readiness"]["ready"] else 503
-        return JSONResponse(health_status, status_code=status_code)
+        return ORJSONResponse(health_status, status_code=status_code)
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             {"status": "error", "error": str(e)},
             status_code=500
         )
@@ -586,10 +863,10 @@ async def health_check():
     """Check health of all components"""
     try:
         health_status = await build_health_payload()
-        return JSONResponse(health_status)
+        return ORJSONResponse(health_status)
         
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             {"status": "error", "error": str(e)}, 
             status_code=500
         )
@@ -599,7 +876,7 @@ async def get_collector_status():
     """Get detailed status of the data collector"""
     try:
         status = data_collector.get_status()
-        return JSONResponse(status)
+        return ORJSONResponse(status)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -608,7 +885,7 @@ async def start_collector():
     """Start the data collector manually"""
     try:
         await data_collector.start()
-        return JSONResponse({"message": "Data collector started", "status": "ok"})
+        return ORJSONResponse({"message": "Data collector started", "status": "ok"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -617,7 +894,7 @@ async def stop_collector():
     """Stop the data collector manually"""
     try:
         await data_collector.stop()
-        return JSONResponse({"message": "Data collector stopped", "status": "ok"})
+        return ORJSONResponse({"message": "Data collector stopped", "status": "ok"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -626,7 +903,7 @@ async def force_upload():
     """Force upload of currently buffered data"""
     try:
         success = await data_collector.force_upload()
-        return JSONResponse({
+        return ORJSONResponse({
             "message": "Upload completed" if success else "Upload failed",
             "status": "ok" if success else "error",
             "buffer_cleared": success
@@ -650,6 +927,11 @@ async def get_config():
                 "parity": config.modbus.parity,
                 "bytesize": config.modbus.bytesize,
                 "stopbits": config.modbus.stopbits,
+                "max_read_count": config.modbus.max_read_count,
+                "max_read_gap": config.modbus.max_read_gap,
+                "retries": config.modbus.retries,
+                "backoff_base": config.modbus.backoff_base,
+                "heartbeat_interval": config.modbus.heartbeat_interval,
             },
             "exporter": {
                 "device_id": config.exporter.device_id,
@@ -660,6 +942,10 @@ async def get_config():
                 "retry_delay": config.exporter.retry_delay,
                 "enable_control": config.exporter.enable_control,
                 "stale_after_seconds": config.exporter.stale_after_seconds,
+                "telemetry_cache_ttl": config.exporter.telemetry_cache_ttl,
+                "device_cache_ttl": config.exporter.device_cache_ttl,
+                "telemetry_poll_interval": config.exporter.telemetry_poll_interval,
+                "telemetry_slow_poll_interval": config.exporter.telemetry_slow_poll_interval,
             },
             "influxdb": {
                 "url": config.influxdb.url,
@@ -671,13 +957,25 @@ async def get_config():
             },
             "http": {
                 "host": config.http.host,
-                "port": config.http.port
+                "port": config.http.port,
+                "access_log": config.http.access_log,
+                "keep_alive_timeout": config.http.keep_alive_timeout,
+                "request_timeout": config.http.request_timeout
             }
         }
-        return JSONResponse(config_dict)
+        return ORJSONResponse(config_dict)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=HTTP_HOST, port=HTTP_PORT)
+    # uvicorn picks uvloop and httptools when they are installed, as main.py does.
+    uvicorn.run(
+        app,
+        host=HTTP_HOST,
+        port=HTTP_PORT,
+        loop="auto",
+        http="auto",
+        access_log=config.http.access_log,
+        timeout_keep_alive=config.http.keep_alive_timeout,
+    )
@@ -22,14 +22,17 @@ def signed_register_word(value: int) -> int:
     return value - 0x10000 if value > 0x7FFF else value
 
 
+_INT32 = struct.Struct(">i")
+_UINT32 = struct.Struct(">I")
+_REGISTER_PAIR = struct.Struct(">HH")
+
+
 def int32_to_registers(value: int) -> list[int]:
-    packed = struct.pack(">i", int(value))
-    return [int.from_bytes(packed[:2], "big"), int.from_bytes(packed[2:], "big")]
+    return list(_REGISTER_PAIR.unpack(_INT32.pack(int(value))))
 
 
 def uint32_to_registers(value: int) -> list[int]:
-    packed = struct.pack(">I", int(value) & 0xFFFFFFFF)
-    return [int.from_bytes(packed[:2], "big"), int.from_bytes(packed[2:], "big")]
+    return list(_REGISTER_PAIR.unpack(_UINT32.pack(int(value) & 0xFFFFFFFF)))
 
 def zero_registers(count: int) -> list[int]:
     return [0 for _ in range(count)]
@@ -45,13 +45,18 @@ def main():
     # Import the FastAPI app from the driver module
     from iot_driver_copilot.huawei_sun_2000_solar_inverter.driver import app
     
-    # Run the server
+    # Run the server; uvicorn picks uvloop and httptools when they are installed.
+    # A single worker: the Modbus connection and caches live in this process.
     uvicorn.run(
         app,
         host=config.http.host,
         port=config.http.port,
         log_level="info",
-        access_log=True
+        loop="auto",
+        http="auto",
+        access_log=config.http.access_log,
+        timeout_keep_alive=config.http.keep_alive_timeout,
+        workers=1
     )
 
 if __name__ == "__main__":
@@ -3,29 +3,50 @@ Modbus client for Huawei SUN2000 solar inverters.
 Separated to avoid circular import issues.
 """
 
+import asyncio
+import functools
+import logging
+import socket
 import struct
-from typing import Any, List
+import time
+from config import config
 from fastapi import HTTPException
 from pymodbus.client import AsyncModbusSerialClient, AsyncModbusTcpClient
-from pymodbus import ModbusException
+from pymodbus.exceptions import ConnectionException, ModbusIOException
 
-def parse_string_registers(registers):
-    """Convert list of registers to string (2 bytes per register, big endian utf-8)."""
-    raw = b"".join(struct.pack(">H", r) for r in registers)
+logger = logging.getLogger(__name__)
+
+_U16 = struct.Struct(">H")
+_I16 = struct.Struct(">h")
+_U32 = struct.Struct(">I")
+_I32 = struct.Struct(">i")
+_U16_PAIR = struct.Struct(">HH")
+
+@functools.lru_cache(maxsize=None)
+def register_struct(count):
+    """Precompiled big-endian struct for `count` 16-bit registers (at most 125 distinct counts)."""
+    return struct.Struct(f">{count}H")
+
+def decode_string_bytes(raw):
+    """Decode the packed bytes of a string field (utf-8, NUL padded)."""
     # Remove trailing nulls/garbage
     return raw.decode("utf-8", errors="ignore").replace('\x00', '').strip()
 
+def parse_string_registers(registers):
+    """Convert list of registers to string (2 bytes per register, big endian utf-8)."""
+    return decode_string_bytes(register_struct(len(registers)).pack(*registers))
+
 def parse_int32_registers(registers):
     """Convert two 16-bit registers to signed 32-bit integer (big endian)"""
     if len(registers) < 2:
         return None
-    return struct.unpack(">i", struct.pack(">HH", registers[0], registers[1]))[0]
+    return _I32.unpack(_U16_PAIR.pack(registers[0], registers[1]))[0]
 
 def parse_uint32_registers(registers):
     """Convert two 16-bit registers to unsigned 32-bit integer (big endian)"""
     if len(registers) < 2:
         return None
-    return struct.unpack(">I", struct.pack(">HH", registers[0], registers[1]))[0]
+    return (registers[0] << 16) | registers[1]
 
 def parse_uint16_register(registers):
     """Convert single 16-bit register to unsigned integer"""
@@ -37,41 +58,95 @@ def parse_int16_register(registers):
     """Convert single 16-bit register to signed integer"""
     if len(registers) < 1:
         return None
-    return struct.unpack(">h", struct.pack(">H", registers[0]))[0]
+    return _I16.unpack(_U16.pack(registers[0]))[0]
 
 def parse_epoch_seconds_registers(registers):
     """Convert two 16-bit registers to epoch seconds timestamp"""
     if len(registers) < 2:
         return None
-    return struct.unpack(">I", struct.pack(">HH", registers[0], registers[1]))[0]
+    return (registers[0] << 16) | registers[1]
+
+REGISTER_PARSERS = {
+    "string": parse_string_registers,
+    "int32": parse_int32_registers,
+    "uint32": parse_uint32_registers,
+    "uint16": parse_uint16_register,
+    "int16": parse_int16_register,
+    "epoch_seconds": parse_epoch_seconds_registers,
+    "mld": list,
+}
 
 def parse_register_value(registers, data_type):
     """Parse a Modbus register payload based on the declared data type."""
-    if data_type == "string":
-        return parse_string_registers(registers)
-    if data_type == "int32":
-        return parse_int32_registers(registers)
-    if data_type == "uint32":
-        return parse_uint32_registers(registers)
-    if data_type == "uint16":
-        return parse_uint16_register(registers)
-    if data_type == "int16":
-        return parse_int16_register(registers)
-    if data_type == "epoch_seconds":
-        return parse_epoch_seconds_registers(registers)
-    if data_type == "mld":
-        return list(registers)
+    parser = REGISTER_PARSERS.get(data_type)
+    if parser is not None:
+        return parser(registers)
     return registers[0] if len(registers) == 1 else list(registers)
 
+# Decimal scales are applied as a division by the matching power of ten, which
+# gives the correctly rounded result directly instead of multiplying and
+# rounding the float error away afterwards.
+SCALE_DIVISORS = {0.1: 10, 0.01: 100, 0.001: 1000}
+
+def scale_register_value(value, scale):
+    """Apply a register scale factor to a parsed numeric value."""
+    if scale == 1 or not isinstance(value, (int, float)):
+        return value
+    divisor = SCALE_DIVISORS.get(scale)
+    if divisor is not None:
+        return value / divisor
+    return round(value * scale, 6)
+
+_FIELD_FORMATS = {
+    "uint16": "H",
+    "int16": "h",
+    "uint32": "I",
+    "int32": "i",
+    "epoch_seconds": "I",
+}
+
+def compile_block_layout(fields):
+    """Fold every numeric field of a block into one struct, padding over gaps.
+
+    Returns (struct, names, others): unpacking the struct yields the values of
+    `names` in order, and `others` lists the fields it cannot cover (strings, MLD).
+    """
+    fmt = [">"]
+    names = []
+    others = []
+    position = 0
+    for name, offset, spec in fields:
+        code = _FIELD_FORMATS.get(spec["type"])
+        if code is None or offset < position:
+            others.append((name, offset, spec))
+            continue
+        if offset > position:
+            fmt.append(f"{(offset - position) * 2}x")
+        fmt.append(code)
+        names.append(name)
+        position = offset + spec["count"]
+    return struct.Struct("".join(fmt)), tuple(names), others
+
+def decode_register_block(registers, layout):
+    """Decode a block's fields from one packed byte buffer using its compiled layout."""
+    unpacker, names, others = layout
+    buffer = register_struct(len(registers)).pack(*registers)
+    values = dict(zip(names, unpacker.unpack_from(buffer)))
+    for name, offset, spec in others:
+        if spec["type"] == "string":
+            # Slice the already packed bytes rather than re-packing the registers
+            values[name] = decode_string_bytes(buffer[offset * 2:(offset + spec["count"]) * 2])
+        else:
+            values[name] = parse_register_value(registers[offset:offset + spec["count"]], spec["type"])
+    return values
+
 def build_int32_registers(value):
     """Convert signed 32-bit integer to two 16-bit registers (big endian)"""
-    packed = struct.pack(">i", int(value))
-    return [struct.unpack(">H", packed[:2])[0], struct.unpack(">H", packed[2:])[0]]
+    return list(_U16_PAIR.unpack(_I32.pack(int(value))))
 
 def build_uint32_registers(value):
     """Convert unsigned 32-bit integer to two 16-bit registers (big endian)"""
-    packed = struct.pack(">I", int(value))
-    return [struct.unpack(">H", packed[:2])[0], struct.unpack(">H", packed[2:])[0]]
+    return list(_U16_PAIR.unpack(_U32.pack(int(value))))
 
 def build_uint16_register(value):
     """Convert unsigned 16-bit integer to a single 16-bit register"""
@@ -79,8 +154,15 @@ def build_uint16_register(value):
 
 def build_int16_register(value):
     """Convert signed 16-bit integer to a single 16-bit register"""
-    packed = struct.pack(">h", int(value))
-    return [struct.unpack(">H", packed)[0]]
+    return [_U16.unpack(_I16.pack(int(value)))[0]]
+
+REGISTER_BUILDERS = {
+    "uint16": build_uint16_register,
+    "int16": build_int16_register,
+    "uint32": build_uint32_registers,
+    "int32": build_int32_registers,
+    "epoch_seconds": build_uint32_registers,
+}
 
 def build_register_payload(spec, value):
     """Build Modbus register payload from a register spec and human-scale value."""
@@ -93,21 +175,92 @@ def build_register_payload(spec, value):
             raise ValueError(f"MLD register write requires exactly {spec['count']} values")
         return [int(item) & 0xFFFF for item in value]
 
+    builder = REGISTER_BUILDERS.get(data_type)
+    if builder is None:
+        raise ValueError(f"Unsupported control register type: {data_type}")
+
     scale = spec.get("scale", 1)
     raw_value = value / scale if scale not in (0, None) else value
-
-    if data_type == "uint16":
-        return build_uint16_register(round(raw_value))
-    if data_type == "int16":
-        return build_int16_register(round(raw_value))
-    if data_type == "uint32":
-        return build_uint32_registers(round(raw_value))
-    if data_type == "int32":
-        return build_int32_registers(round(raw_value))
-    if data_type == "epoch_seconds":
-        return build_uint32_registers(round(raw_value))
-
-    raise ValueError(f"Unsupported control register type: {data_type}")
+    return builder(round(raw_value))
+
+# Modbus caps a single holding-register read at 125 registers.
+MAX_READ_COUNT = 125
+# Over-reading a few unused registers is cheaper than another request round-trip.
+MAX_READ_GAP = 4
+# Modbus caps a single multi-register write (FC16) at 123 registers.
+MAX_WRITE_COUNT = 123
+
+def plan_register_reads(register_map, max_gap=MAX_READ_GAP, max_count=MAX_READ_COUNT):
+    """Group register specs into blocks that can each be fetched with one read.
+
+    Returns a list of (start, count, fields, layout) tuples where fields holds
+    (name, offset, spec) entries relative to the block start and layout is
+    the block's compile_block_layout().
+    """
+    blocks = []
+    for name, spec in sorted(register_map.items(), key=lambda item: item[1]["address"]):
+        address = spec["address"]
+        end = address + spec["count"]
+        if blocks:
+            start, count, fields = blocks[-1]
+            if address - (start + count) <= max_gap and end - start <= max_count:
+                blocks[-1] = (start, max(count, end - start), fields)
+                fields.append((name, address - start, spec))
+                continue
+        blocks.append((address, spec["count"], [(name, 0, spec)]))
+    return [(start, count, fields, compile_block_layout(fields)) for start, count, fields in blocks]
+
+# Keepalive probes let a dead TCP peer surface as a connection error within
+# about a minute instead of leaving requests to hit the Modbus timeout.
+TCP_KEEPALIVE_IDLE = 30
+TCP_KEEPALIVE_INTERVAL = 10
+TCP_KEEPALIVE_COUNT = 3
+
+# Transport failures are retried with exponential backoff starting in the
+# millisecond range; exception responses are answers and are never retried.
+RETRYABLE_ERRORS = (ConnectionException, ModbusIOException, OSError)
+MAX_RETRY_BACKOFF = 0.5
+
+# Modbus exception code for a register the device does not implement.
+ILLEGAL_DATA_ADDRESS = 2
+
+class ModbusErrorResponse(HTTPException):
+    """An exception response from the inverter; keeps its Modbus exception code."""
+
+    def __init__(self, operation, resp):
+        super().__init__(status_code=502, detail=f"Modbus {operation} error: {resp}")
+        self.exception_code = getattr(resp, "exception_code", None)
+
+# inverter_state: a single register every SUN2000 answers, used to probe idle links.
+HEARTBEAT_ADDRESS = 32000
+
+def configure_tcp_socket(sock):
+    """Disable Nagle for small Modbus frames and enable TCP keepalive."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # macOS names the idle option TCP_KEEPALIVE; Windows before 10 exposes none of them.
+    idle_option = getattr(socket, "TCP_KEEPIDLE", None) or getattr(socket, "TCP_KEEPALIVE", None)
+    for option, value in (
+        (idle_option, TCP_KEEPALIVE_IDLE),
+        (getattr(socket, "TCP_KEEPINTVL", None), TCP_KEEPALIVE_INTERVAL),
+        (getattr(socket, "TCP_KEEPCNT", None), TCP_KEEPALIVE_COUNT),
+    ):
+        if option is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, option, value)
+
+def select_register_blocks(plan, names):
+    """Restrict a read plan to the named fields, trimming each block to the span they cover."""
+    wanted = set(names)
+    selected = []
+    for start, _, fields, _ in plan:
+        kept = [field for field in fields if field[0] in wanted]
+        if not kept:
+            continue
+        first = kept[0][1]
+        last = max(offset + spec["count"] for _, offset, spec in kept)
+        trimmed = [(name, offset - first, spec) for name, offset, spec in kept]
+        selected.append((start + first, last - first, trimmed, compile_block_layout(trimmed)))
+    return selected
 
 class HuaweiModbusClient:
     def __init__(
@@ -122,6 +275,8 @@ class HuaweiModbusClient:
         parity="N",
         bytesize=8,
         stopbits=1,
+        retries=0,
+        backoff_base=0.005,
     ):
         self.transport = transport.strip().lower()
         self.host = host
@@ -133,17 +288,30 @@ class HuaweiModbusClient:
         self.parity = parity
         self.bytesize = bytesize
         self.stopbits = stopbits
+        self.retries = retries
+        self.backoff_base = backoff_base
         self.client = None
+        self._connect_lock = asyncio.Lock()
+        self._inflight = {}
+        self._split_blocks = set()
+        self._last_activity = time.monotonic()
 
     async def connect(self):
-        if self.client is not None and self.client.connected:
-            return
-
+        # Requests that find the link down share a single reconnect; opening a
+        # second client would leak a socket or fail outright on a serial port.
+        async with self._connect_lock:
+            if self.client is not None and self.client.connected:
+                return
+            self.close()
+            await self._open()
+
+    async def _open(self):
         if self.transport == "tcp":
             self.client = AsyncModbusTcpClient(
                 self.host,
                 port=self.port,
                 timeout=self.timeout,
+                retries=0,  # SUN2000_MODBUS_RETRIES is the only retry policy
             )
         elif self.transport == "rtu":
             if not self.serial_port:
@@ -155,6 +323,7 @@ class HuaweiModbusClient:
                 bytesize=self.bytesize,
                 stopbits=self.stopbits,
                 timeout=self.timeout,
+                retries=0,
             )
         else:
             raise ValueError(f"Unsupported Modbus transport: {self.transport}")
@@ -165,6 +334,44 @@ class HuaweiModbusClient:
                 raise ConnectionError(f"Unable to connect to Modbus device at {self.host}:{self.port}")
             raise ConnectionError(f"Unable to connect to Modbus RTU device at {self.serial_port}")
 
+        if self.transport == "tcp":
+            # ctx is pymodbus internals; the tuning is best-effort if it moves.
+            transport = getattr(getattr(self.client, "ctx", None), "transport", None)
+            sock = transport.get_extra_info("socket") if transport is not None else None
+            if sock is not None:
+                try:
+                    configure_tcp_socket(sock)
+                except OSError as exc:
+                    logger.warning("Unable to tune Modbus TCP socket options: %s", exc)
+
+    async def _get_client(self):
+        # Steady state never touches _connect_lock; only a (re)connect does.
+        client = self.client
+        if client is not None and client.connected:
+            return client
+        await self.connect()
+        return self.client
+
+    async def heartbeat(self, interval):
+        """Probe the link whenever it has been idle for `interval` seconds, reconnecting on failure."""
+        while True:
+            idle = time.monotonic() - self._last_activity
+            if idle < interval:
+                await asyncio.sleep(interval - idle)
+                continue
+            try:
+                await self.read_holding_registers(HEARTBEAT_ADDRESS, 1)
+            except HTTPException:
+                pass  # An exception response still proves the link is alive
+            except Exception as exc:
+                logger.warning("Modbus heartbeat failed, reconnecting: %s", exc)
+                self.close()
+                try:
+                    await self.connect()
+                except Exception as exc:
+                    logger.warning("Modbus reconnect failed: %s", exc)
+                await asyncio.sleep(interval)
+
     def is_connected(self):
         return self.client is not None and self.client.connected
 
@@ -177,22 +384,150 @@ class HuaweiModbusClient:
             self.client = None
 
     async def read_holding_registers(self, address, count):
-        if self.client is None or not self.client.connected:
-            await self.connect()
-        resp = await self.client.read_holding_registers(address, count=count, device_id=self.unit_id)
+        # Concurrent readers of the same window share one Modbus transaction.
+        # The read is shielded so a cancelled caller does not abort it for
+        # everyone else waiting on the same result.
+        key = (address, count)
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._read_holding_registers(address, count))
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda task: self._finish_inflight(key, task))
+        return await asyncio.shield(pending)
+
+    def _finish_inflight(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved even if every waiter went away
+
+    def _discard_client(self, client, exc):
+        """Drop a client whose link failed so the next request reconnects instead of reusing it."""
+        if client is None or client is not self.client:
+            return  # Never opened, or already replaced by a concurrent reconnect
+        if isinstance(exc, ModbusIOException) and self.transport != "tcp":
+            return  # A serial timeout means the inverter did not answer; the port itself is fine
+        logger.info("Dropping Modbus connection after %s", exc)
+        self.close()
+
+    async def _read_holding_registers(self, address, count):
+        attempt = 0
+        while True:
+            client = None
+            try:
+                client = await self._get_client()
+                resp = await client.read_holding_registers(address, count=count, device_id=self.unit_id)
+                break
+            except RETRYABLE_ERRORS as exc:
+                self._discard_client(client, exc)
+                if attempt >= self.retries:
+                    raise
+                delay = min(MAX_RETRY_BACKOFF, self.backoff_base * (2 ** attempt))
+                attempt += 1
+                logger.debug("Modbus read %s+%s failed (%s); retry %s in %.3fs", address, count, exc, attempt, delay)
+                await asyncio.sleep(delay)
+        self._last_activity = time.monotonic()
         if resp.isError():
-            raise HTTPException(status_code=502, detail=f"Modbus read error: {resp}")
+            raise ModbusErrorResponse("read", resp)
         return resp.registers
 
+    async def read_register_blocks(self, blocks):
+        """Read planned register blocks and slice out the registers of each field.
+
+        Returns (registers, errors) keyed by field name. When the inverter rejects
+        a block (for example a reserved register inside a gap) its fields are
+        retried individually, and that block is read per field from then on;
+        transport failures are reported for the whole block.
+        """
+        registers = {}
+        errors = {}
+        for _, field_registers, block_errors in await self._read_blocks(blocks):
+            registers.update(field_registers)
+            errors.update(block_errors)
+        return registers, errors
+
+    async def read_register_values(self, blocks):
+        """Like read_register_blocks, but returns parsed (unscaled) field values."""
+        values = {}
+        errors = {}
+        results = await self._read_blocks(blocks)
+        for (_, _, fields, layout), (block, field_registers, block_errors) in zip(blocks, results):
+            errors.update(block_errors)
+            if block is not None:
+                values.update(decode_register_block(block, layout))
+                continue
+            for name, _, spec in fields:
+                if name in field_registers:
+                    values[name] = parse_register_value(field_registers[name], spec["type"])
+        return values, errors
+
+    async def _read_blocks(self, blocks):
+        return await asyncio.gather(*(self._read_block(start, count, fields) for start, count, fields, _ in blocks))
+
+    async def _read_block(self, start, count, fields):
+        """Return (block, registers, errors); block is None if it had to be split."""
+        registers = {}
+        errors = {}
+        block = None
+        if (start, count) not in self._split_blocks:
+            try:
+                block = await self.read_holding_registers(start, count)
+            except HTTPException as exc:
+                if len(fields) == 1:
+                    errors[fields[0][0]] = exc
+                    return None, registers, errors
+                # An unimplemented register is a property of the register map, so later
+                # reads go straight to the per-field requests instead of failing first.
+                # Other exception responses (device busy, gateway errors) are transient.
+                if getattr(exc, "exception_code", None) == ILLEGAL_DATA_ADDRESS:
+                    self._split_blocks.add((start, count))
+                    logger.info("Inverter rejected registers %s+%s; reading its %s fields separately", start, count, len(fields))
+            except Exception as exc:
+                for name, _, _ in fields:
+                    errors[name] = exc
+                return None, registers, errors
+
+        if block is not None:
+            for name, offset, spec in fields:
+                registers[name] = block[offset:offset + spec["count"]]
+            return block, registers, errors
+
+        results = await asyncio.gather(
+            *(self.read_holding_registers(spec["address"], spec["count"]) for _, _, spec in fields),
+            return_exceptions=True,
+        )
+        for (name, _, _), result in zip(fields, results):
+            if isinstance(result, Exception):
+                errors[name] = result
+            else:
+                registers[name] = result
+        return None, registers, errors
+
     async def write_registers(self, address, values):
-        if self.client is None or not self.client.connected:
-            await self.connect()
-        if len(values) == 1:
-            resp = await self.client.write_register(address, values[0], device_id=self.unit_id)
-        else:
-            resp = await self.client.write_registers(address, values, device_id=self.unit_id)
+        # pymodbus runs transactions in order, so a read queued before this write
+        # would report pre-write values; later reads must not join it.
+        self._inflight.clear()
+        # Writes are not retried in general since the inverter may already have
+        # applied them. A ConnectionException is raised before anything is sent,
+        # so that one case gets a single reconnect and resend.
+        for attempt in range(2):
+            client = await self._get_client()
+            try:
+                if len(values) == 1:
+                    resp = await client.write_register(address, values[0], device_id=self.unit_id)
+                else:
+                    resp = await client.write_registers(address, values, device_id=self.unit_id)
+                break
+            except ConnectionException as exc:
+                self._discard_client(client, exc)
+                if attempt:
+                    raise
+            except RETRYABLE_ERRORS as exc:
+                self._discard_client(client, exc)
+                raise
+        self._last_activity = time.monotonic()
         if resp.isError():
-            raise HTTPException(status_code=502, detail=f"Modbus write error: {resp}")
+            raise ModbusErrorResponse("write", resp)
 
 ModbusTCPClient = HuaweiModbusClient
 
@@ -280,6 +615,15 @@ DEVICE_MAP = {
     "max_reactive_power_absorb_from_grid": {"address": 30081, "count": 2, "type": "int32", "scale": 0.001, "unit": "kVar"},
 }
 
+# Read plans are static, so build them once instead of on every request.
+# Devices that reject long or gap-spanning reads can shrink the blocks.
+_PLAN_LIMITS = {
+    "max_gap": config.modbus.max_read_gap,
+    "max_count": min(config.modbus.max_read_count, MAX_READ_COUNT),
+}
+TELEMETRY_READ_PLAN = plan_register_reads(TELEMETRY_MAP, **_PLAN_LIMITS)
+DEVICE_READ_PLAN = plan_register_reads(DEVICE_MAP, **_PLAN_LIMITS)
+
 CONTROL_MAP = {
     "active_power_kw_derating": {"address": 40120, "count": 1, "type": "uint16", "scale": 0.1},
     "power_factor_setting": {"address": 40122, "count": 1, "type": "int16", "scale": 0.001},
@@ -358,3 +702,5 @@ SETTINGS_MAP = {
     "afci": {"address": 42073, "count": 1, "type": "uint16", "scale": 1, "unit": "", "description": "AFCI enable"},
     "afci_detection_adaptation_mode": {"address": 42074, "count": 1, "type": "uint16", "scale": 1, "unit": "", "description": "AFCI detection adaptation mode"},
 }
+
+SETTINGS_READ_PLAN = plan_register_reads(SETTINGS_MAP, **_PLAN_LIMITS)
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+from config import config
+
+
+class TelemetryCache:
+    """Bounded-staleness cache of scaled telemetry values served by /telemetry"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._locks: Dict[Tuple[int, int], asyncio.Lock] = {}
+        # Bumped by invalidate(); readers pass the value they started with to update()
+        self.generation = 0
+
+    def get_fresh(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Return cached values that are younger than the TTL"""
+        if self.ttl <= 0:
+            return {}
+        cutoff = time.monotonic() - self.ttl
+        fresh = {}
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] >= cutoff:
+                fresh[name] = entry[1]
+        return fresh
+
+    def update(self, values: Dict[str, Any], timestamp: Optional[float] = None, generation: Optional[int] = None):
+        """Store freshly read values, unless an invalidation happened since `generation` was taken"""
+        if generation is not None and generation != self.generation:
+            return
+        stamp = time.monotonic() if timestamp is None else timestamp
+        for name, value in values.items():
+            self._entries[name] = (stamp, value)
+
+    def age(self, names: Iterable[str]) -> Optional[float]:
+        """Seconds since the oldest of the given values was read, or None if none are cached"""
+        oldest = None
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is not None and (oldest is None or entry[0] < oldest):
+                oldest = entry[0]
+        return None if oldest is None else time.monotonic() - oldest
+
+    def invalidate(self):
+        """Drop every cached value, e.g. after a control or settings write"""
+        self.generation += 1
+        self._entries.clear()
+
+    def lock(self, start: int, count: int) -> asyncio.Lock:
+        """Lock shared by concurrent readers of the same register block"""
+        key = (start, count)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+
+# Global telemetry cache instance
+telemetry_cache = TelemetryCache(config.exporter.telemetry_cache_ttl)
@@ -0,0 +1,87 @@
+import unittest
+from unittest import mock
+
+from modbus_client import CONTROL_MAP, SETTINGS_MAP
+from fakes import FakeModbus
+from iot_driver_copilot.huawei_sun_2000_solar_inverter import driver
+
+
+def pending(*names):
+    return [(index, name, CONTROL_MAP[name], [0] * CONTROL_MAP[name]["count"]) for index, name in enumerate(names)]
+
+
+class GroupContiguousWritesTests(unittest.TestCase):
+    def test_adjacent_setpoints_are_merged(self):
+        groups = driver.group_contiguous_writes(pending(
+            "power_factor_setting",
+            "reactive_power_compensation_qs",
+            "reactive_power_adjustment_time",
+        ))
+        self.assertEqual([[name for _, name, _, _ in group] for group in groups], [[
+            "power_factor_setting",
+            "reactive_power_compensation_qs",
+            "reactive_power_adjustment_time",
+        ]])
+
+    def test_non_adjacent_and_reordered_writes_stay_separate(self):
+        groups = driver.group_contiguous_writes(pending("reactive_power_compensation_qs", "power_factor_setting"))
+        self.assertEqual(len(groups), 2)
+
+    def test_command_triggers_are_never_merged(self):
+        groups = driver.group_contiguous_writes(pending("active_power_percentage_control", "power_on", "shutdown"))
+        self.assertEqual([[name for _, name, _, _ in group] for group in groups], [
+            ["active_power_percentage_control"], ["power_on"], ["shutdown"],
+        ])
+
+
+class WriteConstraintsTests(unittest.TestCase):
+    def test_precomputed_constraints_match_register_specs(self):
+        for register_map in (CONTROL_MAP, SETTINGS_MAP):
+            for name, spec in register_map.items():
+                self.assertEqual(driver.get_write_constraints(name, spec), driver.describe_write_constraints(name, spec), name)
+
+
+class ControlDeviceTests(unittest.IsolatedAsyncioTestCase):
+    async def test_contiguous_commands_use_one_write(self):
+        registers = {spec["address"] + i: 0 for spec in CONTROL_MAP.values() for i in range(spec["count"])}
+        fake = FakeModbus(registers)
+        command = driver.ControlCommand(commands=[
+            {"name": "power_factor_setting", "value": 0.95},
+            {"name": "reactive_power_compensation_qs", "value": 0.1},
+            {"name": "unknown", "value": 1},
+        ])
+        with mock.patch.object(driver.modbus_client, "client", fake), \
+                mock.patch.object(driver.config.exporter, "enable_control", True), \
+                mock.patch.object(driver, "schedule_telemetry_refresh"):
+            response = await driver.control_device(command)
+
+        self.assertEqual(fake.writes, [(40122, [950, 100])])
+        self.assertEqual(fake.reads, [(40122, 2)])
+        body = driver.orjson.loads(response.body)
+        self.assertEqual([result["status"] for result in body["results"]], ["ok", "ok", "error"])
+        self.assertEqual(body["results"][0]["read_back"]["value"], 0.95)
+        self.assertEqual(body["results"][1]["read_back"]["value"], 0.1)
+
+
+class PutSettingsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_settings_are_validated_before_adjacent_writes_are_merged(self):
+        registers = {spec["address"] + i: 0 for spec in SETTINGS_MAP.values() for i in range(spec["count"])}
+        fake = FakeModbus(registers)
+        request = driver.SettingsWriteRequest(settings=[
+            {"name": "power_factor_setting", "value": 0.95},
+            {"name": "reactive_power_compensation_qs", "value": 0.1},
+            {"name": "reactive_power_adjustment_time", "value": "soon"},
+        ])
+        with mock.patch.object(driver.modbus_client, "client", fake), \
+                mock.patch.object(driver.config.exporter, "enable_control", True), \
+                mock.patch.object(driver, "schedule_telemetry_refresh"):
+            response = await driver.put_settings(request)
+
+        self.assertEqual(fake.writes, [(40122, [950, 100])])
+        body = driver.orjson.loads(response.body)
+        self.assertEqual([result["status"] for result in body["results"]], ["ok", "ok", "error"])
+        self.assertEqual(body["results"][1]["read_back"]["value"], 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
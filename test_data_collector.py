@@ -0,0 +1,36 @@
+import unittest
+
+from data_collector import DataCollector
+from fakes import make_client
+from modbus_client import DEVICE_MAP, DEVICE_READ_PLAN, TELEMETRY_MAP, TELEMETRY_READ_PLAN
+
+
+class CollectorTelemetryTests(unittest.IsolatedAsyncioTestCase):
+    async def test_collector_reads_one_request_per_block(self):
+        registers = {addr: 1 for start, count, _, _ in TELEMETRY_READ_PLAN for addr in range(start, start + count)}
+        collector = DataCollector()
+        collector.modbus_client = make_client(registers)
+        telemetry = await collector._collect_telemetry_data()
+        self.assertEqual(len(collector.modbus_client.client.reads), len(TELEMETRY_READ_PLAN))
+        self.assertEqual(set(telemetry), set(TELEMETRY_MAP))
+        self.assertNotIn(None, telemetry.values())
+
+    async def test_device_info_is_one_request(self):
+        registers = {addr: 0 for start, count, _, _ in DEVICE_READ_PLAN for addr in range(start, start + count)}
+        collector = DataCollector()
+        collector.modbus_client = make_client(registers)
+        await collector._collect_device_info()
+        self.assertEqual(collector.modbus_client.client.reads, [(start, count) for start, count, _, _ in DEVICE_READ_PLAN])
+        self.assertEqual(set(collector.device_info), set(DEVICE_MAP))
+
+    async def test_stop_leaves_a_shared_client_open(self):
+        shared = make_client({})
+        collector = DataCollector()
+        collector.use_modbus_client(shared)
+        collector.is_running = True
+        await collector.stop()
+        self.assertIsNotNone(shared.client)
+
+
+if __name__ == "__main__":
+    unittest.main()
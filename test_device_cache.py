@@ -0,0 +1,40 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from fakes import DriverTestCase
+from modbus_client import DEVICE_MAP, DEVICE_READ_PLAN
+
+
+class DeviceCacheTests(DriverTestCase):
+    async def test_device_info_is_read_once_and_cached(self):
+        results = await asyncio.gather(*(self.driver.read_device_info() for _ in range(3)))
+        self.assertEqual(self.fake.reads, [(start, count) for start, count, _, _ in DEVICE_READ_PLAN])
+        self.assertEqual(set(results[0]), set(DEVICE_MAP))
+        self.assertTrue(all(result is results[0] for result in results))
+        await self.driver.read_device_info()
+        self.assertEqual(len(self.fake.reads), len(DEVICE_READ_PLAN))
+
+    async def test_expired_device_info_is_read_again(self):
+        await self.driver.read_device_info()
+        with mock.patch.object(self.driver.config.exporter, "device_cache_ttl", 0):
+            await self.driver.read_device_info()
+        self.assertEqual(len(self.fake.reads), 2 * len(DEVICE_READ_PLAN))
+
+    async def test_device_info_is_seeded_from_the_collector(self):
+        snapshot = {key: 1 for key in DEVICE_MAP}
+        with mock.patch.object(self.driver.data_collector, "device_info", snapshot):
+            self.assertIs(await self.driver.read_device_info(), snapshot)
+        self.assertEqual(self.fake.reads, [])
+
+    async def test_partial_collector_snapshot_is_not_used(self):
+        snapshot = dict.fromkeys(DEVICE_MAP, 1)
+        snapshot[next(iter(DEVICE_MAP))] = None
+        with mock.patch.object(self.driver.data_collector, "device_info", snapshot):
+            info = await self.driver.read_device_info()
+        self.assertNotIn(None, info.values())
+        self.assertEqual(len(self.fake.reads), len(DEVICE_READ_PLAN))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from fakes import FakeResponse, make_client
+from modbus_client import plan_register_reads
+
+
+class ReadRegisterBlocksTests(unittest.IsolatedAsyncioTestCase):
+    async def test_block_is_read_once_and_sliced(self):
+        client = make_client({100: 1, 101: 2, 102: 3, 103: 4})
+        blocks = plan_register_reads({
+            "a": {"address": 100, "count": 2, "type": "int32"},
+            "b": {"address": 103, "count": 1, "type": "uint16"},
+        })
+        registers, errors = await client.read_register_blocks(blocks)
+        self.assertEqual(client.client.reads, [(100, 4)])
+        self.assertEqual(registers, {"a": [1, 2], "b": [4]})
+        self.assertEqual(errors, {})
+
+    async def test_rejected_block_falls_back_to_field_reads(self):
+        client = make_client({100: 7, 103: 9})
+        blocks = plan_register_reads({
+            "a": {"address": 100, "count": 1, "type": "uint16"},
+            "b": {"address": 103, "count": 1, "type": "uint16"},
+            "c": {"address": 104, "count": 1, "type": "uint16"},
+        })
+        registers, errors = await client.read_register_blocks(blocks)
+        self.assertEqual(registers, {"a": [7], "b": [9]})
+        self.assertEqual(list(errors), ["c"])
+        self.assertIsInstance(errors["c"], HTTPException)
+
+    async def test_rejected_block_is_not_requested_again(self):
+        client = make_client({100: 7, 103: 9})
+        blocks = plan_register_reads({
+            "a": {"address": 100, "count": 1, "type": "uint16"},
+            "b": {"address": 103, "count": 1, "type": "uint16"},
+        })
+        await client.read_register_blocks(blocks)
+        client.client.reads.clear()
+        registers, errors = await client.read_register_blocks(blocks)
+        self.assertEqual(client.client.reads, [(100, 1), (103, 1)])
+        self.assertEqual(registers, {"a": [7], "b": [9]})
+
+    async def test_busy_response_does_not_split_the_block(self):
+        client = make_client({100: 7, 101: 8})
+        blocks = plan_register_reads({
+            "a": {"address": 100, "count": 1, "type": "uint16"},
+            "b": {"address": 101, "count": 1, "type": "uint16"},
+        })
+        fake = client.client
+        real_read = fake.read_holding_registers
+        busy = [FakeResponse(error=True, exception_code=6)]
+
+        async def busy_once(address, count, device_id=0):
+            if busy:
+                fake.reads.append((address, count))
+                return busy.pop()
+            return await real_read(address, count, device_id)
+
+        fake.read_holding_registers = busy_once
+        await client.read_register_blocks(blocks)
+        fake.reads.clear()
+        registers, errors = await client.read_register_blocks(blocks)
+        self.assertEqual(fake.reads, [(100, 2)])
+        self.assertEqual(registers, {"a": [7], "b": [8]})
+
+    async def test_concurrent_identical_reads_share_one_transaction(self):
+        client = make_client({100: 5, 101: 6})
+        results = await asyncio.gather(*(client.read_holding_registers(100, 2) for _ in range(5)))
+        self.assertEqual(client.client.reads, [(100, 2)])
+        self.assertEqual(results, [[5, 6]] * 5)
+        await client.read_holding_registers(100, 2)
+        self.assertEqual(len(client.client.reads), 2)
+
+    async def test_reads_after_a_write_do_not_join_earlier_reads(self):
+        client = make_client({100: 1})
+        fake = client.client
+        real_read = fake.read_holding_registers
+        gate = asyncio.Event()
+
+        async def queued_read(address, count, device_id=0):
+            response = await real_read(address, count, device_id)
+            await gate.wait()
+            return response
+
+        fake.read_holding_registers = queued_read
+        earlier = asyncio.ensure_future(client.read_holding_registers(100, 1))
+        while not fake.reads:
+            await asyncio.sleep(0)
+        fake.read_holding_registers = real_read
+        await client.write_registers(100, [7])
+        gate.set()
+        self.assertEqual(await client.read_holding_registers(100, 1), [7])
+        self.assertEqual(await earlier, [1])
+
+    async def test_register_values_are_decoded(self):
+        client = make_client({100: 0xFFFF, 101: 0xFFFE, 102: 42})
+        blocks = plan_register_reads({
+            "a": {"address": 100, "count": 2, "type": "int32"},
+            "b": {"address": 102, "count": 1, "type": "uint16"},
+        })
+        values, errors = await client.read_register_values(blocks)
+        self.assertEqual(values, {"a": -2, "b": 42})
+        self.assertEqual(errors, {})
+
+    async def test_transport_errors_are_retried(self):
+        client = make_client({100: 3})
+        client.retries = 2
+        client.backoff_base = 0
+        real_read = client.client.read_holding_registers
+        failures = [ModbusIOException("timeout")]
+
+        async def flaky_read(address, count, device_id=0):
+            if failures:
+                raise failures.pop()
+            return await real_read(address, count, device_id)
+
+        client.client.read_holding_registers = flaky_read
+        self.assertEqual(await client.read_holding_registers(100, 1), [3])
+        self.assertEqual(failures, [])
+
+    async def test_transport_errors_reconnect_before_retrying(self):
+        client = make_client({100: 3})
+        client.retries = 1
+        client.backoff_base = 0
+        fake = client.client
+        real_read = fake.read_holding_registers
+        failures = [ModbusIOException("timeout")]
+
+        async def flaky_read(address, count, device_id=0):
+            if failures:
+                raise failures.pop()
+            return await real_read(address, count, device_id)
+
+        fake.read_holding_registers = flaky_read
+        self.assertEqual(await client.read_holding_registers(100, 1), [3])
+        self.assertEqual(client.opens, 1)
+
+    async def test_write_is_resent_once_after_connection_error(self):
+        client = make_client({})
+        fake = client.client
+        real_write = fake.write_registers
+        failures = [ConnectionException("not connected")]
+
+        async def flaky_write(address, values, device_id=0):
+            if failures:
+                raise failures.pop()
+            return await real_write(address, values, device_id)
+
+        fake.write_registers = flaky_write
+        await client.write_registers(40122, [950, 100])
+        self.assertEqual(fake.writes, [(40122, [950, 100])])
+        self.assertEqual(client.opens, 1)
+
+    async def test_write_timeouts_are_not_resent(self):
+        client = make_client({})
+        fake = client.client
+
+        async def timed_out_write(address, values, device_id=0):
+            fake.writes.append((address, list(values)))
+            raise ModbusIOException("timeout")
+
+        fake.write_registers = timed_out_write
+        with self.assertRaises(ModbusIOException):
+            await client.write_registers(40122, [950, 100])
+        self.assertEqual(len(fake.writes), 1)
+        self.assertIsNone(client.client)
+
+    async def test_exception_responses_are_not_retried(self):
+        client = make_client({})
+        client.retries = 2
+        with self.assertRaises(HTTPException):
+            await client.read_holding_registers(100, 1)
+        self.assertEqual(client.client.reads, [(100, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import asyncio
+import socket
+import unittest
+
+from fakes import make_client
+from modbus_client import TCP_KEEPALIVE_IDLE, configure_tcp_socket
+
+
+class TcpSocketTests(unittest.TestCase):
+    def test_nodelay_and_keepalive_are_enabled(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            configure_tcp_socket(sock)
+            self.assertTrue(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+            self.assertTrue(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                self.assertEqual(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE), TCP_KEEPALIVE_IDLE)
+
+
+class HeartbeatTests(unittest.IsolatedAsyncioTestCase):
+    async def test_idle_link_is_probed(self):
+        client = make_client({32000: 512})
+        task = asyncio.create_task(client.heartbeat(0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        self.assertIn((32000, 1), client.client.reads)
+
+    async def test_busy_link_is_not_probed(self):
+        client = make_client({32000: 512})
+        task = asyncio.create_task(client.heartbeat(10))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        self.assertEqual(client.client.reads, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
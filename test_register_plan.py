@@ -0,0 +1,77 @@
+import unittest
+
+from modbus_client import (
+    DEVICE_MAP, TELEMETRY_MAP, TELEMETRY_READ_PLAN, decode_register_block, SCALE_DIVISORS, parse_register_value,
+    plan_register_reads, scale_register_value, select_register_blocks,
+)
+
+
+class RegisterPlanTests(unittest.TestCase):
+    def test_adjacent_registers_share_a_block(self):
+        register_map = {
+            "a": {"address": 100, "count": 2, "type": "int32"},
+            "b": {"address": 102, "count": 1, "type": "uint16"},
+            "c": {"address": 105, "count": 1, "type": "uint16"},
+        }
+        blocks = plan_register_reads(register_map)
+        self.assertEqual(len(blocks), 1)
+        start, count, fields, _ = blocks[0]
+        self.assertEqual((start, count), (100, 6))
+        self.assertEqual([(name, offset) for name, offset, _ in fields], [("a", 0), ("b", 2), ("c", 5)])
+
+    def test_large_gap_splits_blocks(self):
+        register_map = {
+            "a": {"address": 100, "count": 1, "type": "uint16"},
+            "b": {"address": 200, "count": 1, "type": "uint16"},
+        }
+        self.assertEqual([(s, c) for s, c, _, _ in plan_register_reads(register_map)], [(100, 1), (200, 1)])
+
+    def test_blocks_respect_modbus_read_limit(self):
+        blocks = plan_register_reads(TELEMETRY_MAP, max_gap=1000)
+        self.assertTrue(all(count <= 125 for _, count, _, _ in blocks))
+        planned = sorted(name for _, _, fields, _ in blocks for name, _, _ in fields)
+        self.assertEqual(planned, sorted(TELEMETRY_MAP))
+
+    def test_selected_blocks_are_trimmed_to_requested_fields(self):
+        plan = plan_register_reads({
+            "a": {"address": 100, "count": 1, "type": "uint16"},
+            "b": {"address": 102, "count": 2, "type": "int32"},
+            "c": {"address": 105, "count": 1, "type": "uint16"},
+            "d": {"address": 200, "count": 1, "type": "uint16"},
+        })
+        selected = select_register_blocks(plan, ["b", "c"])
+        self.assertEqual(len(selected), 1)
+        start, count, fields, _ = selected[0]
+        self.assertEqual((start, count), (102, 4))
+        self.assertEqual([(name, offset) for name, offset, _ in fields], [("b", 0), ("c", 3)])
+
+
+class DecodeRegisterBlockTests(unittest.TestCase):
+    def test_block_decode_matches_per_field_parsing(self):
+        for register_map in (TELEMETRY_MAP, DEVICE_MAP):
+            for start, count, fields, layout in plan_register_reads(register_map):
+                block = [(0x8000 + start + i * 257) & 0xFFFF for i in range(count)]
+                values = decode_register_block(block, layout)
+                for name, offset, spec in fields:
+                    expected = parse_register_value(block[offset:offset + spec["count"]], spec["type"])
+                    self.assertEqual(values[name], expected, name)
+
+    def test_trimmed_blocks_carry_their_own_layout(self):
+        names = [name for name, spec in TELEMETRY_MAP.items() if spec["type"] in ("int32", "uint16")][::3]
+        for start, count, fields, layout in select_register_blocks(TELEMETRY_READ_PLAN, names):
+            block = [(start + i * 97) & 0xFFFF for i in range(count)]
+            values = decode_register_block(block, layout)
+            self.assertEqual(set(values), {name for name, _, _ in fields})
+            for name, offset, spec in fields:
+                self.assertEqual(values[name], parse_register_value(block[offset:offset + spec["count"]], spec["type"]))
+
+    def test_decimal_scales_match_multiply_and_round(self):
+        for scale in SCALE_DIVISORS:
+            for value in (-70001, -3, 0, 3, 12345, 4294967295):
+                self.assertEqual(scale_register_value(value, scale), round(value * scale, 6))
+        self.assertEqual(scale_register_value(7, 1), 7)
+        self.assertEqual(scale_register_value("SUN2000", 0.1), "SUN2000")
+
+
+if __name__ == "__main__":
+    unittest.main()
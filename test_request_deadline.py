@@ -0,0 +1,29 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from fakes import DriverTestCase, asgi_get
+
+
+class RequestDeadlineTests(DriverTestCase):
+    async def test_slow_reads_are_answered_at_the_deadline(self):
+        real_read = self.fake.read_holding_registers
+
+        async def slow_read(address, count, device_id=0):
+            await asyncio.sleep(3)
+            return await real_read(address, count, device_id)
+
+        self.fake.read_holding_registers = slow_read
+        with mock.patch.object(self.driver.config.http, "request_timeout", 0.2):
+            for path in ("/telemetry", "/device", "/settings"):
+                started = time.monotonic()
+                status, _ = await asgi_get(self.driver.app, path)
+                self.assertEqual(status, 504, path)
+                self.assertLess(time.monotonic() - started, 1, path)
+        for task in list(self.driver.modbus_client._inflight.values()):
+            task.cancel()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import time
+import unittest
+
+from telemetry_cache import TelemetryCache
+
+
+class TelemetryCacheTests(unittest.TestCase):
+    def test_values_within_ttl_are_fresh(self):
+        cache = TelemetryCache(ttl=5.0)
+        cache.update({"active_power": 12.5, "grid_frequency": 50.0})
+        self.assertEqual(cache.get_fresh(["active_power", "efficiency"]), {"active_power": 12.5})
+
+    def test_expired_values_are_not_served(self):
+        cache = TelemetryCache(ttl=5.0)
+        cache.update({"active_power": 12.5}, timestamp=time.monotonic() - 10)
+        self.assertEqual(cache.get_fresh(["active_power"]), {})
+
+    def test_zero_ttl_disables_cache(self):
+        cache = TelemetryCache(ttl=0)
+        cache.update({"active_power": 12.5})
+        self.assertEqual(cache.get_fresh(["active_power"]), {})
+
+    def test_age_tracks_the_oldest_requested_value(self):
+        cache = TelemetryCache(ttl=5.0)
+        cache.update({"active_power": 12.5}, timestamp=time.monotonic() - 3)
+        cache.update({"grid_frequency": 50.0})
+        self.assertGreaterEqual(cache.age(["active_power", "grid_frequency"]), 3)
+        self.assertLess(cache.age(["grid_frequency"]), 3)
+        self.assertIsNone(cache.age(["efficiency"]))
+
+    def test_invalidate_drops_all_values(self):
+        cache = TelemetryCache(ttl=5.0)
+        cache.update({"active_power": 12.5})
+        cache.invalidate()
+        self.assertEqual(cache.get_fresh(["active_power"]), {})
+
+    def test_reads_started_before_invalidate_are_dropped(self):
+        cache = TelemetryCache(ttl=5.0)
+        generation = cache.generation
+        cache.invalidate()
+        cache.update({"inverter_state": 1}, generation=generation)
+        self.assertEqual(cache.get_fresh(["inverter_state"]), {})
+        cache.update({"inverter_state": 7}, generation=cache.generation)
+        self.assertEqual(cache.get_fresh(["inverter_state"]), {"inverter_state": 7})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from fakes import DriverTestCase
+from modbus_client import TELEMETRY_READ_PLAN
+
+
+class TelemetryEndpointTests(DriverTestCase):
+    async def test_telemetry_is_served_from_the_cache_within_ttl(self):
+        first = await self.driver.get_telemetry(None)
+        reads = len(self.fake.reads)
+        self.assertEqual(reads, len(TELEMETRY_READ_PLAN))
+        second = await self.driver.get_telemetry(None)
+        self.assertEqual(len(self.fake.reads), reads)
+        self.assertEqual(second.body, first.body)
+        await self.driver.get_telemetry(["active_power"])
+        self.assertEqual(len(self.fake.reads), reads)
+
+    async def test_telemetry_age_ignores_fields_that_were_not_served(self):
+        self.driver.telemetry_cache.update({"startup_time": 1}, timestamp=time.monotonic() - 60)
+        del self.fake.registers[32091]
+        response = await self.driver.get_telemetry(["active_power", "startup_time"])
+        self.assertIsNone(self.driver.orjson.loads(response.body)["startup_time"])
+        self.assertLess(float(response.headers["X-Telemetry-Age"]), 60)
+
+    async def test_poller_logs_failed_reads(self):
+        self.fake.registers.clear()
+        with self.assertLogs(self.driver.logger, "WARNING") as logs:
+            task = asyncio.create_task(self.driver.poll_telemetry(10, 10))
+            for _ in range(100):
+                if logs.output:
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+        self.assertIn("Telemetry poll failed", logs.output[0])
+
+    async def test_refresh_after_write_logs_failures(self):
+        with mock.patch.object(self.driver, "read_telemetry_block", side_effect=ValueError("short response")), \
+                self.assertLogs(self.driver.logger, "WARNING") as logs:
+            await self.driver.refresh_telemetry_cache()
+        self.assertIn("short response", logs.output[0])
+
+    def test_polled_cache_ttl_outlasts_the_slow_tier(self):
+        timeout = self.driver.config.modbus.timeout
+        self.assertEqual(self.driver.polled_cache_ttl(1.0, 1, 10), 11 + timeout)
+        self.assertEqual(self.driver.polled_cache_ttl(1.0, 5, 2), 10 + timeout)
+        self.assertEqual(self.driver.polled_cache_ttl(300, 1, 10), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()